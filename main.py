@@ -1,164 +1,624 @@
-import yfinance as yf
-import pandas as pd
-from datetime import datetime, timedelta
+import asyncio
+import os
+import threading
 import time
-from typing import Dict, Any
+import weakref
+import httpx
+from hishel import AsyncSqliteStorage, BaseFilter, FilterPolicy, Request, Response
+from hishel.httpx import AsyncCacheTransport
+from aiolimiter import AsyncLimiter
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_exponential
+import numpy as np
+import pandas as pd
+from datetime import timedelta
+from typing import Dict, Any, List, AsyncIterator, Optional, Tuple
 import pytz
 
-def get_stock_info(ticker_symbol: str) -> Dict[str, Any]:
+QUOTE_URL = "https://query1.finance.yahoo.com/v7/finance/quote"
+QUOTE_SUMMARY_URL = "https://query2.finance.yahoo.com/v10/finance/quoteSummary/{symbol}"
+CHART_URL = "https://query2.finance.yahoo.com/v8/finance/chart/{symbol}"
+COOKIE_URL = "https://fc.yahoo.com"
+CRUMB_URL = "https://query1.finance.yahoo.com/v1/test/getcrumb"
+CRUMB_PATHS = ('/v7/finance/quote', '/v10/finance/quoteSummary/')  # Endpoints that reject requests without a crumb
+HEADERS = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                         "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"}
+QUOTE_FIELDS = "symbol,shortName,regularMarketPrice"  # Only the fields we use, not the full ~80 field quote
+QUOTE_BATCH_SIZE = 20  # Yahoo accepts roughly this many comma-separated symbols per quote request
+MAX_CONCURRENCY = 8
+POOL_SIZE = 20
+MAX_CONNECTIONS = 40
+KEEPALIVE_TIMEOUT = 30  # Seconds an idle pooled connection is kept open for reuse
+REQUEST_TIMEOUT = 10.0
+MAX_RETRIES = 3
+RETRY_BACKOFF = 0.5
+MAX_RETRY_WAIT = 30
+RETRY_STATUSES = {401, 429, 502, 503}  # 401 means the crumb expired and is refreshed before retrying
+
+class MalformedResponseError(Exception):
     """
-    Retrieves stock info such as company name, next earnings date, and dividend details.
-    
+    Raised where a Yahoo payload is parsed and does not have the expected shape.
+    """
+
+# Payload shape errors (KeyError, IndexError, ...) are converted to MalformedResponseError where the JSON is parsed
+PARSE_ERRORS = (KeyError, IndexError, TypeError, ValueError)
+
+# Failures we expect from the network or from a malformed Yahoo payload; anything else is a bug and should surface
+FETCH_ERRORS = (httpx.HTTPError, MalformedResponseError)
+
+# "Now" is read once per stream_stock_info run and passed down, so a long-lived process never uses a stale clock
+NY_TZ = pytz.timezone('America/New_York')
+MAX_FUTURE = pd.Timedelta(days=180)  # Maximum 6 months in future
+DATE_COLUMNS = ['Next Earnings Report Date', 'Ex-Dividend Date']
+
+# Output columns with fixed dtypes, so pandas does not infer them row by row.
+# Dates stay naive New York timestamps and the yield a float until the batch is formatted for output.
+SCHEMA = [
+    ('Stock Symbol', 'U16'),
+    ('Company Name', 'U128'),
+    ('Next Earnings Report Date', 'datetime64[ns]'),
+    ('Dividend Offered', 'U3'),
+    ('Ex-Dividend Date', 'datetime64[ns]'),
+    ('Annual Dividend Yield', 'f8')
+]
+
+# Names, calendars and dividend history change at most daily, so repeat runs are served from disk.
+# Only successful requests given one of these TTLs are cached; the cookie and crumb are always fetched live.
+# Cache keys never contain the crumb, since YahooTransport adds it below the cache.
+CACHE_PATH = "yf_cache.sqlite"
+QUOTE_CACHE_TTL = timedelta(minutes=15).total_seconds()
+CALENDAR_CACHE_TTL = timedelta(hours=6).total_seconds()
+DIVIDEND_CACHE_TTL = timedelta(days=1).total_seconds()
+
+# Yahoo cookie and crumb, reused by every client in this process until Yahoo rejects the crumb
+CRUMB_CACHE: Dict[str, Any] = {}
+CRUMB_LOCKS: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Lock]' = weakref.WeakKeyDictionary()
+
+# Parsed earnings dates and dividend histories keyed by (symbol, field), so repeat lookups skip JSON parsing.
+# Entries hold (expiry, value) and expire with the HTTP cache TTL of the response they were parsed from,
+# so a long-lived process never serves data older than the on-disk cache would.
+PARSED_CACHE: Dict[Tuple[str, str], Tuple[float, Any]] = {}
+# Coroutines of one event loop never interleave inside these critical sections, so the lock only
+# matters for callers on other threads, e.g. get_stock_info run from a thread pool
+PARSED_CACHE_LOCK = threading.Lock()
+
+# Token bucket shared by every network request of an event loop; only blocks once the per-minute budget is spent
+RATE_LIMIT = 30
+RATE_LIMIT_PERIOD = 60
+RATE_LIMITERS: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncLimiter]' = weakref.WeakKeyDictionary()
+
+class HasCacheTTL(BaseFilter[Request]):
+    """
+    Cache filter that only stores requests which were sent with a hishel_ttl extension.
+    """
+    def needs_body(self) -> bool:
+        return False
+
+    def apply(self, item: Request, body: Optional[bytes]) -> bool:
+        return item.metadata.get('hishel_ttl') is not None
+
+class IsSuccessful(BaseFilter[Response]):
+    """
+    Cache filter that only stores 2xx responses, so rate limits and errors are never replayed from disk.
+    """
+    def needs_body(self) -> bool:
+        return False
+
+    def apply(self, item: Response, body: Optional[bytes]) -> bool:
+        return 200 <= item.status_code < 300
+
+def get_rate_limiter() -> AsyncLimiter:
+    """
+    Returns the running event loop's rate limiter; AsyncLimiter must not be shared across loops.
+    """
+    loop = asyncio.get_running_loop()
+    if loop not in RATE_LIMITERS:
+        RATE_LIMITERS[loop] = AsyncLimiter(max_rate=RATE_LIMIT, time_period=RATE_LIMIT_PERIOD)
+    return RATE_LIMITERS[loop]
+
+class YahooTransport(httpx.AsyncBaseTransport):
+    """
+    Transport below the cache that adds the session crumb to the endpoints requiring it and rate limits
+    requests that actually reach the network. Cache hits never get here, so they cost no limiter token
+    and the crumb stays out of the cache keys.
+    """
+    def __init__(self, transport: httpx.AsyncBaseTransport) -> None:
+        self.transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if request.url.path.startswith(CRUMB_PATHS) and 'crumb' in CRUMB_CACHE:
+            request.url = request.url.copy_add_param('crumb', CRUMB_CACHE['crumb'])
+        async with get_rate_limiter():
+            return await self.transport.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+def create_client() -> httpx.AsyncClient:
+    """
+    Creates a cached HTTP/2 client, so concurrent Yahoo requests are multiplexed over shared keep-alive connections.
+
+    Returns:
+        httpx.AsyncClient: The configured client
+    """
+    network = httpx.AsyncHTTPTransport(
+        http2=True,
+        limits=httpx.Limits(max_keepalive_connections=POOL_SIZE, max_connections=MAX_CONNECTIONS,
+                            keepalive_expiry=KEEPALIVE_TIMEOUT)
+    )
+    cache = AsyncCacheTransport(
+        next_transport=YahooTransport(network),
+        storage=AsyncSqliteStorage(database_path=CACHE_PATH),
+        policy=FilterPolicy(request_filters=[HasCacheTTL()], response_filters=[IsSuccessful()])
+    )
+    return httpx.AsyncClient(
+        transport=cache,
+        timeout=httpx.Timeout(REQUEST_TIMEOUT),
+        headers=HEADERS,
+        follow_redirects=True
+    )
+
+def is_retryable(error: BaseException) -> bool:
+    """
+    Returns True for expired crumb, rate limit and gateway responses that are worth retrying.
+    """
+    return isinstance(error, httpx.HTTPStatusError) and error.response.status_code in RETRY_STATUSES
+
+# Shared by every Yahoo request, including the cookie and crumb handshake
+retry_policy = retry(retry=retry_if_exception(is_retryable),
+                     wait=wait_exponential(multiplier=RETRY_BACKOFF, max=MAX_RETRY_WAIT),
+                     stop=stop_after_attempt(MAX_RETRIES),
+                     reraise=True)
+
+@retry_policy
+async def get_crumb(client: httpx.AsyncClient) -> str:
+    """
+    Obtains the Yahoo consent cookie and the crumb that must accompany quote and quoteSummary requests.
+    Both are acquired once per process and copied into later clients instead of being fetched again.
+
     Args:
-        ticker_symbol (str): The stock ticker symbol
-        
+        client (httpx.AsyncClient): Client whose cookie jar will hold the Yahoo cookie
+
     Returns:
-        Dict[str, Any]: Dictionary containing stock information
+        str: The crumb token for this client
     """
+    if 'crumb' not in CRUMB_CACHE:
+        # fc.yahoo.com answers with a 404 but still sets the cookie the crumb is tied to
+        await client.get(COOKIE_URL)
+        response = await client.get(CRUMB_URL)
+        response.raise_for_status()
+        CRUMB_CACHE['cookies'] = httpx.Cookies(client.cookies)
+        CRUMB_CACHE['crumb'] = response.text
+    else:
+        client.cookies.update(CRUMB_CACHE['cookies'])
+    return CRUMB_CACHE['crumb']
+
+def get_crumb_lock() -> asyncio.Lock:
+    """
+    Returns the running event loop's crumb refresh lock; asyncio locks must not be shared across loops.
+    """
+    loop = asyncio.get_running_loop()
+    if loop not in CRUMB_LOCKS:
+        CRUMB_LOCKS[loop] = asyncio.Lock()
+    return CRUMB_LOCKS[loop]
+
+async def refresh_crumb(client: httpx.AsyncClient, stale_crumb: Optional[str]) -> None:
+    """
+    Replaces a crumb Yahoo rejected with a 401. Concurrent requests that were sent with the same
+    stale crumb trigger a single refresh; the others pick up the new cookie and crumb.
+
+    Args:
+        client (httpx.AsyncClient): The shared HTTP client
+        stale_crumb (Optional[str]): The crumb the rejected request was sent with
+    """
+    async with get_crumb_lock():
+        if CRUMB_CACHE.get('crumb') == stale_crumb:
+            CRUMB_CACHE.clear()
+            client.cookies.clear()
+        await get_crumb(client)
+
+@retry_policy
+async def get_json(client: httpx.AsyncClient, semaphore: asyncio.Semaphore,
+                   url: str, params: Dict[str, str], cache_ttl: float) -> Dict[str, Any]:
+    """
+    Performs a GET request and decodes the JSON body, backing off on rate limits and gateway errors
+    and refreshing the crumb when Yahoo rejects it.
+
+    Args:
+        client (httpx.AsyncClient): The shared HTTP client
+        semaphore (asyncio.Semaphore): Caps the number of in-flight requests
+        url (str): The endpoint to request
+        params (Dict[str, str]): Query string parameters
+        cache_ttl (float): Seconds the response may be served from the cache
+
+    Returns:
+        Dict[str, Any]: The decoded JSON response
+    """
+    async with semaphore:
+        crumb = CRUMB_CACHE.get('crumb')
+        response = await client.get(url, params=params, extensions={'hishel_ttl': cache_ttl})
+    if response.status_code == 401:
+        # The crumb expired; fetch a new one so the retry is sent with it
+        await refresh_crumb(client, crumb)
+    response.raise_for_status()
     try:
-        time.sleep(1)
-        ticker = yf.Ticker(ticker_symbol)
-        
-        # Initialize default values
-        company_name = 'N/A'
-        next_earnings_date = None
-        dividend_offered = 'No'
-        ex_dividend_date = None
-        annual_dividend_yield = None
-
-        # Get company info
-        try:
-            info = ticker.info
-            company_name = info.get('shortName', 'N/A')
-        except Exception as e:
-            print(f"Error getting info for {ticker_symbol}: {str(e)}")
-            info = {}
+        return response.json()
+    except ValueError as e:
+        raise MalformedResponseError(f"Invalid JSON from {url}") from e
+
+async def fetch_quote_batch(client: httpx.AsyncClient, semaphore: asyncio.Semaphore,
+                            stock_symbols: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Retrieves quotes (name and price) for many tickers using one request per batch of symbols.
+
+    Args:
+        client (httpx.AsyncClient): The shared HTTP client
+        semaphore (asyncio.Semaphore): Caps the number of in-flight requests
+        stock_symbols (List[str]): The stock ticker symbols
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Quote data keyed by ticker symbol
+    """
+    batches = [stock_symbols[i:i + QUOTE_BATCH_SIZE] for i in range(0, len(stock_symbols), QUOTE_BATCH_SIZE)]
+    responses = await asyncio.gather(
+        *[get_json(client, semaphore, QUOTE_URL, {'symbols': ','.join(batch), 'fields': QUOTE_FIELDS},
+                   QUOTE_CACHE_TTL) for batch in batches],
+        return_exceptions=True
+    )
 
-        # Get earnings date - try multiple methods
+    quotes = {}
+    for batch, data in zip(batches, responses):
         try:
-            # Method 1: Try calendar
+            if isinstance(data, BaseException):
+                raise data
             try:
-                calendar = ticker.calendar
-                if isinstance(calendar, pd.DataFrame) and 'Earnings Date' in calendar.index:
-                    next_earnings_date = calendar.loc['Earnings Date'].iloc[0]
-            except:
-                pass
-
-            # Method 2: Try earnings_dates if calendar failed
-            if not next_earnings_date:
-                earnings_dates = ticker.earnings_dates
-                if isinstance(earnings_dates, pd.DataFrame) and not earnings_dates.empty:
-                    ny_tz = pytz.timezone('America/New_York')
-                    current_date = datetime.now(ny_tz)
-                    
-                    # Convert timestamps to UTC for comparison
-                    if earnings_dates.index.tz is not None:
-                        current_date = current_date.astimezone(pytz.UTC)
-                        future_dates = earnings_dates[earnings_dates.index > current_date]
-                    else:
-                        # If dates are naive, localize them first
-                        localized_dates = earnings_dates.index.tz_localize(ny_tz)
-                        current_date = current_date.astimezone(ny_tz)
-                        future_dates = earnings_dates[localized_dates > current_date]
-                        
-                    if not future_dates.empty:
-                        next_earnings_date = future_dates.index[0]
-        except Exception as e:
-            print(f"Error getting earnings date for {ticker_symbol}: {str(e)}")
-
-        # Get dividend information
+                for quote in data['quoteResponse']['result']:
+                    quotes[quote['symbol']] = quote
+            except PARSE_ERRORS as e:
+                raise MalformedResponseError(f"Unexpected quote response: {e!r}") from e
+        except FETCH_ERRORS as e:
+            print(f"Error getting quotes for {','.join(batch)}: {str(e)}")
+    return quotes
+
+def to_new_york(timestamp: pd.Timestamp) -> pd.Timestamp:
+    """
+    Converts a UTC timestamp into naive New York wall time, comparable to parsed dates.
+    """
+    return timestamp.tz_convert(NY_TZ).tz_localize(None)
+
+def epochs_to_utc(epochs: List[int]) -> pd.DatetimeIndex:
+    """
+    Converts Yahoo's epoch-second timestamps into a UTC DatetimeIndex, the single timezone used for comparisons.
+    """
+    return pd.to_datetime(epochs, unit='s', utc=True)
+
+def get_parsed(ticker_symbol: str, field: str) -> Any:
+    """
+    Returns a previously parsed field for a ticker, or None if it has not been fetched yet or has expired.
+    """
+    with PARSED_CACHE_LOCK:
+        expiry, value = PARSED_CACHE.get((ticker_symbol, field), (0.0, None))
+        if expiry <= time.monotonic():
+            PARSED_CACHE.pop((ticker_symbol, field), None)
+            return None
+        return value
+
+def store_parsed(ticker_symbol: str, field: str, value: Any, ttl: float) -> Any:
+    """
+    Remembers a parsed field for a ticker for ttl seconds and returns it.
+    """
+    with PARSED_CACHE_LOCK:
+        PARSED_CACHE[(ticker_symbol, field)] = (time.monotonic() + ttl, value)
+    return value
+
+async def fetch_earnings_dates(client: httpx.AsyncClient, semaphore: asyncio.Semaphore,
+                               ticker_symbol: str) -> pd.DatetimeIndex:
+    """
+    Retrieves a ticker's earnings dates from the calendarEvents quoteSummary module; it cannot be batched across symbols.
+    """
+    earnings_dates = get_parsed(ticker_symbol, 'earnings_dates')
+    if earnings_dates is not None:
+        return earnings_dates
+
+    data = await get_json(client, semaphore, QUOTE_SUMMARY_URL.format(symbol=ticker_symbol),
+                          {'modules': 'calendarEvents'}, CALENDAR_CACHE_TTL)
+    try:
+        earnings = data['quoteSummary']['result'][0].get('calendarEvents', {}).get('earnings', {})
+        earnings_dates = epochs_to_utc([d['raw'] for d in earnings.get('earningsDate', [])])
+    except PARSE_ERRORS as e:
+        raise MalformedResponseError(f"Unexpected calendarEvents response: {e!r}") from e
+    return store_parsed(ticker_symbol, 'earnings_dates', earnings_dates, CALENDAR_CACHE_TTL)
+
+async def fetch_dividends(client: httpx.AsyncClient, semaphore: asyncio.Semaphore,
+                          ticker_symbol: str) -> pd.Series:
+    """
+    Retrieves the full dividend history for a ticker as a Series indexed by (naive New York) ex-dividend date.
+    """
+    dividends = get_parsed(ticker_symbol, 'dividends')
+    if dividends is not None:
+        return dividends
+
+    data = await get_json(client, semaphore, CHART_URL.format(symbol=ticker_symbol),
+                          {'range': 'max', 'interval': '3mo', 'events': 'div'}, DIVIDEND_CACHE_TTL)
+    try:
+        events = data['chart']['result'][0].get('events', {}).get('dividends', {})
+        dividends = pd.Series({event['date']: event['amount'] for event in events.values()}, dtype=float)
+    except PARSE_ERRORS as e:
+        raise MalformedResponseError(f"Unexpected chart response: {e!r}") from e
+    dividends.index = epochs_to_utc(dividends.index).tz_convert(NY_TZ).tz_localize(None)
+    return store_parsed(ticker_symbol, 'dividends', dividends.sort_index(), DIVIDEND_CACHE_TTL)
+
+async def fetch_stock_info(client: httpx.AsyncClient, ticker_symbol: str,
+                           semaphore: asyncio.Semaphore, quote: Dict[str, Any],
+                           now: pd.Timestamp) -> Tuple[Dict[str, Any], Optional[pd.Series]]:
+    """
+    Retrieves stock info such as company name, next earnings date, and dividend details.
+    The dividend yield is computed afterwards for the whole batch by add_dividend_yields.
+
+    Args:
+        client (httpx.AsyncClient): The shared HTTP client
+        ticker_symbol (str): The stock ticker symbol
+        semaphore (asyncio.Semaphore): Caps the number of in-flight requests
+        quote (Dict[str, Any]): This ticker's entry from fetch_quote_batch
+        now (pd.Timestamp): The run's current UTC time
+
+    Returns:
+        Tuple[Dict[str, Any], Optional[pd.Series]]: Dictionary containing stock information,
+            and the dividend history (None if it could not be fetched) for add_dividend_yields
+    """
+    earnings_dates, recent_dividends = await asyncio.gather(
+        fetch_earnings_dates(client, semaphore, ticker_symbol),
+        fetch_dividends(client, semaphore, ticker_symbol),
+        return_exceptions=True
+    )
+
+    # Initialize default values
+    next_earnings_date = None
+    dividend_offered = 'No'
+    ex_dividend_date = None
+
+    # Company info comes from the batched quote request
+    company_name = quote.get('shortName', 'N/A')
+
+    # Get earnings date
+    try:
+        if isinstance(earnings_dates, BaseException):
+            raise earnings_dates
+        future_dates = earnings_dates[earnings_dates > now]
+        if not future_dates.empty:
+            next_earnings_date = to_new_york(future_dates[0])
+    except FETCH_ERRORS as e:
+        print(f"Error getting earnings date for {ticker_symbol}: {str(e)}")
+
+    # Get dividend information
+    try:
+        if isinstance(recent_dividends, BaseException):
+            raise recent_dividends
+
+        # The history is sorted, so its last entry is the most recent ex-dividend date
+        if not recent_dividends.empty:
+            dividend_offered = 'Yes'
+            ex_dividend_date = recent_dividends.index[-1]
+    except FETCH_ERRORS as e:
+        print(f"Error getting dividend info for {ticker_symbol}: {str(e)}")
+
+    return {
+        'Stock Symbol': ticker_symbol,
+        'Company Name': company_name,
+        'Next Earnings Report Date': next_earnings_date,
+        'Dividend Offered': dividend_offered,
+        'Ex-Dividend Date': ex_dividend_date
+    }, None if isinstance(recent_dividends, BaseException) else recent_dividends
+
+def unavailable_stock_info(ticker_symbol: str) -> Dict[str, Any]:
+    """
+    Returns the row reported for a ticker when nothing could be fetched for it.
+    """
+    return {
+        'Stock Symbol': ticker_symbol,
+        'Company Name': 'N/A',
+        'Next Earnings Report Date': None,
+        'Dividend Offered': 'N/A',
+        'Ex-Dividend Date': None
+    }
+
+def build_frame(results: List[Dict[str, Any]]) -> pd.DataFrame:
+    """
+    Converts fetch_stock_info results into a DataFrame with the SCHEMA dtypes, via one structured array.
+
+    Args:
+        results (List[Dict[str, Any]]): Stock information dictionaries, one per ticker
+
+    Returns:
+        pd.DataFrame: Stock information with one row per ticker and one column per SCHEMA field
+    """
+    records = np.array([tuple(info.get(name) for name, _ in SCHEMA) for info in results], dtype=SCHEMA)
+    return pd.DataFrame.from_records(records)
+
+def add_dividend_yields(df: pd.DataFrame, quotes: Dict[str, Dict[str, Any]],
+                        dividends: Dict[str, pd.Series], now: pd.Timestamp) -> pd.DataFrame:
+    """
+    Sets each ticker's annual dividend yield from its dividends over the last complete calendar year,
+    resampling the dividend histories of the whole batch together. Tickers that paid nothing last year,
+    such as new payers, fall back to their dividends over the trailing twelve months.
+
+    Args:
+        df (pd.DataFrame): Stock information for one batch, one row per ticker
+        quotes (Dict[str, Dict[str, Any]]): The batch's quotes from fetch_quote_batch
+        dividends (Dict[str, pd.Series]): The batch's dividend histories from fetch_dividends, keyed by ticker
+        now (pd.Timestamp): The run's current UTC time
+
+    Returns:
+        pd.DataFrame: The same DataFrame with the Annual Dividend Yield column filled in
+    """
+    if not dividends:
+        return df
+
+    now_ny = to_new_york(now)
+    history = pd.concat([d.rename(symbol) for symbol, d in dividends.items()], axis=1)
+    annual_dividends = history.resample('YE').sum()
+    last_year = annual_dividends[annual_dividends.index.year == now_ny.year - 1].sum()
+    trailing_year = history[history.index > now_ny - pd.DateOffset(years=1)].sum()
+    paid = last_year.where(last_year > 0, trailing_year)
+
+    latest_prices = pd.Series({symbol: quote.get('regularMarketPrice') for symbol, quote in quotes.items()}, dtype=float)
+    # A missing or zero price leaves the yield NaN instead of dividing into inf
+    dividend_yields = paid / latest_prices.where(latest_prices > 0) * 100
+    df['Annual Dividend Yield'] = df['Stock Symbol'].map(dividend_yields)
+    return df
+
+def drop_distant_dates(df: pd.DataFrame, now: pd.Timestamp) -> pd.DataFrame:
+    """
+    Clears report and ex-dividend dates more than six months ahead, for every ticker in one pass.
+
+    Args:
+        df (pd.DataFrame): Stock information as returned by fetch_stock_info, one row per ticker
+        now (pd.Timestamp): The run's current UTC time
+
+    Returns:
+        pd.DataFrame: The same DataFrame with distant dates removed
+    """
+    max_future = to_new_york(now + MAX_FUTURE)  # Naive wall time, comparable to parsed dates
+    for column in DATE_COLUMNS:
+        df.loc[df[column] > max_future, column] = pd.NaT
+    return df
+
+def format_output(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Formats a batch for output: dates as YYYY-MM-DD and the yield as a percentage, with 'N/A' for missing values.
+
+    Args:
+        df (pd.DataFrame): Stock information with raw datetime and float columns
+
+    Returns:
+        pd.DataFrame: The same DataFrame with its columns formatted for output
+    """
+    for column in DATE_COLUMNS:
+        # Truncating to datetime64[D] renders ISO dates without parsing a format string for every row
+        dates = df[column]
+        iso_dates = pd.Series(dates.to_numpy().astype('datetime64[D]').astype(str), index=df.index)
+        df[column] = iso_dates.where(dates.notna(), 'N/A')
+
+    dividend_yield = df['Annual Dividend Yield']
+    formatted_yield = pd.Series(np.char.mod('%.2f%%', dividend_yield.to_numpy()), index=df.index)
+    df['Annual Dividend Yield'] = formatted_yield.where(dividend_yield > 0, 'N/A')
+    return df
+
+async def stream_stock_info(stock_symbols: List[str]) -> AsyncIterator[pd.DataFrame]:
+    """
+    Retrieves stock info concurrently over a single HTTP client, yielding one DataFrame per batch of symbols.
+
+    Args:
+        stock_symbols (List[str]): The stock ticker symbols
+
+    Yields:
+        pd.DataFrame: Stock information for one batch, one row per ticker in the order each ticker finished
+    """
+    async with create_client() as client:
         try:
-            # Get recent dividends
-            recent_dividends = ticker.dividends
-            
-            if not recent_dividends.empty:
-                dividend_offered = 'Yes'
-                
-                # Calculate annual dividend yield from recent dividends
-                annual_div_rate = recent_dividends.head(4).sum() if len(recent_dividends) >= 4 else recent_dividends.sum() * (4 / len(recent_dividends))
-                latest_price = info.get('regularMarketPrice', info.get('currentPrice'))
-                if latest_price:
-                    annual_dividend_yield = (annual_div_rate / latest_price) * 100
-                
-                # Get most recent ex-dividend date
-                if len(recent_dividends) > 0:
-                    ex_dividend_date = recent_dividends.index[-1].strftime('%Y-%m-%d')
-
-        except Exception as e:
-            print(f"Error getting dividend info for {ticker_symbol}: {str(e)}")
-
-        # Validate dates are not in the distant future
-        ny_tz = pytz.timezone('America/New_York')
-        current_date = datetime.now(ny_tz)
-        max_future_date = current_date + timedelta(days=180)  # Maximum 6 months in future
-        
-        if next_earnings_date:
-            if isinstance(next_earnings_date, pd.Timestamp):
-                # Convert both dates to UTC for comparison
-                if next_earnings_date.tz is not None:
-                    next_earnings_date_utc = next_earnings_date.tz_convert('UTC')
-                else:
-                    next_earnings_date_utc = next_earnings_date.tz_localize(ny_tz).tz_convert('UTC')
-                    
-                max_future_date_utc = max_future_date.astimezone(pytz.UTC)
-                if next_earnings_date_utc > max_future_date_utc:
-                    next_earnings_date = None
-
-        if ex_dividend_date:
+            await get_crumb(client)  # YahooTransport adds it to every request that needs it
+        except FETCH_ERRORS as e:
+            # Without a crumb no quote or calendar request can succeed, so every ticker is unavailable
+            print(f"Failed to connect to Yahoo Finance: {str(e)}")
+            yield format_output(build_frame([unavailable_stock_info(s) for s in stock_symbols]))
+            return
+
+        semaphore = asyncio.Semaphore(MAX_CONCURRENCY)
+        now = pd.Timestamp.now(tz='UTC')  # One clock reading per run, shared by every ticker
+        processed = 0
+
+        for i in range(0, len(stock_symbols), QUOTE_BATCH_SIZE):
+            batch = stock_symbols[i:i + QUOTE_BATCH_SIZE]
+            quotes = await fetch_quote_batch(client, semaphore, batch)
+            tasks = [fetch_stock_info(client, s, semaphore, quotes.get(s, {}), now) for s in batch]
+
+            # Collect each ticker as soon as it is done rather than waiting on the slowest one
+            results = []
+            dividends = {}
+            for task in asyncio.as_completed(tasks):
+                info, history = await task
+                results.append(info)
+                if history is not None:
+                    dividends[info['Stock Symbol']] = history
+                processed += 1
+                print(f"Processed {info['Stock Symbol']} ({processed}/{len(stock_symbols)})")
+            df = add_dividend_yields(build_frame(results), quotes, dividends, now)
+            yield format_output(drop_distant_dates(df, now))
+
+async def fetch_all_stock_info(stock_symbols: List[str]) -> pd.DataFrame:
+    """
+    Retrieves stock info for every symbol into a single DataFrame.
+
+    Args:
+        stock_symbols (List[str]): The stock ticker symbols
+
+    Returns:
+        pd.DataFrame: Stock information, one row per ticker
+    """
+    return pd.concat([batch async for batch in stream_stock_info(stock_symbols)], ignore_index=True)
+
+async def save_stock_data(stock_symbols: List[str], path: str) -> int:
+    """
+    Writes stock info to a CSV file batch by batch, so memory stays flat. Batches go to a temporary file
+    next to the target, which only replaces it once some data was fetched; a failed run keeps the last good output.
+
+    Args:
+        stock_symbols (List[str]): The stock ticker symbols
+        path (str): The CSV file to write
+
+    Returns:
+        int: The number of rows written, including a partial file when fetching fails part way,
+            or 0 if nothing was fetched and the file was left untouched
+    """
+    temp_path = path + '.tmp'
+    row_count = 0
+    fetched_count = 0
+    try:
+        with open(temp_path, 'w', newline='') as f:
             try:
-                ex_div_dt = datetime.strptime(ex_dividend_date, '%Y-%m-%d')
-                ex_div_dt = ny_tz.localize(ex_div_dt)
-                if ex_div_dt > max_future_date:
-                    ex_dividend_date = None
-            except:
-                pass
-
-        return {
-            'Stock Symbol': ticker_symbol,
-            'Company Name': company_name,
-            'Next Earnings Report Date': next_earnings_date.strftime('%Y-%m-%d') if isinstance(next_earnings_date, pd.Timestamp) else 'N/A',
-            'Dividend Offered': dividend_offered,
-            'Ex-Dividend Date': ex_dividend_date if ex_dividend_date else 'N/A',
-            'Annual Dividend Yield': f"{annual_dividend_yield:.2f}%" if annual_dividend_yield else 'N/A'
-        }
-
-    except Exception as e:
-        print(f"Failed to process {ticker_symbol}: {str(e)}")
-        return {
-            'Stock Symbol': ticker_symbol,
-            'Company Name': 'N/A',
-            'Next Earnings Report Date': 'N/A',
-            'Dividend Offered': 'N/A',
-            'Ex-Dividend Date': 'N/A',
-            'Annual Dividend Yield': 'N/A'
-        }
+                async for batch in stream_stock_info(stock_symbols):
+                    batch.to_csv(f, index=False, header=row_count == 0)
+                    row_count += len(batch)
+                    # Rows that are 'N/A' in every column besides the symbol hold nothing worth saving
+                    fetched_count += (batch.drop(columns='Stock Symbol') != 'N/A').any(axis=1).sum()
+            except FETCH_ERRORS as e:
+                # Batches already written are still saved, so report them rather than losing the count
+                print(f"Stopped fetching after {row_count} rows: {str(e)}")
+        if not fetched_count:
+            return 0
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    return row_count
+
+def get_stock_info(ticker_symbol: str) -> Dict[str, Any]:
+    """
+    Synchronous wrapper around fetch_stock_info for a single ticker.
+
+    Args:
+        ticker_symbol (str): The stock ticker symbol
+
+    Returns:
+        Dict[str, Any]: Dictionary containing stock information
+    """
+    return asyncio.run(fetch_all_stock_info([ticker_symbol])).iloc[0].to_dict()
 
 def main():
-    stock_symbols = ["AAPL", "MSFT", "GOOGL", "AMZN", 
-                     "TSLA", "META", "V", "JPM", 
+    stock_symbols = ["AAPL", "MSFT", "GOOGL", "AMZN",
+                     "TSLA", "META", "V", "JPM",
                      "DIS", "NFLX"]
 
-    results = []
-    total_stocks = len(stock_symbols)
-    
-    for idx, symbol in enumerate(stock_symbols, 1):
-        try:
-            info = get_stock_info(symbol)
-            results.append(info)
-            print(f"Processed {symbol} ({idx}/{total_stocks})")
-        except Exception as e:
-            print(f"Failed to process {symbol}: {str(e)}")
-            continue
-
-    if results:
-        df = pd.DataFrame(results)
-        try:
-            df.to_csv("stock_data.csv", index=False)
-            print("Data saved to stock_data.csv")
-        except Exception as e:
-            print(f"Error saving to CSV: {str(e)}")
+    row_count = 0
+
+    try:
+        row_count = asyncio.run(save_stock_data(stock_symbols, "stock_data.csv"))
+    except OSError as e:
+        print(f"Error saving to CSV: {str(e)}")
+
+    if row_count:
+        print("Data saved to stock_data.csv")
     else:
         print("No data was collected")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -2,10 +2,72 @@
 
 import pytest
 import os
+import socket
 import pandas as pd
-from data_retrieval import get_stock_info
-from analysis_pipeline import fetch_additional_metrics
+import main
+import asyncio
+import httpx
+import numpy as np
+from main import (get_stock_info, fetch_stock_info, store_parsed, build_frame, add_dividend_yields,
+                  drop_distant_dates, format_output, to_new_york, MAX_FUTURE, SCHEMA)
 
+# Fixed clock for the offline tests, so year selection does not depend on when they run
+NOW = pd.Timestamp("2026-03-10 15:00", tz="UTC")
+NOW_NY = to_new_york(NOW)
+
+def scrub_cookies(response):
+    """
+    Drop the Yahoo session cookie from recorded responses; replays do not need it.
+    """
+    for header in ("set-cookie", "Set-Cookie"):
+        response["headers"].pop(header, None)
+    return response
+
+@pytest.fixture(scope="module")
+def vcr_config():
+    """
+    Record Yahoo Finance traffic once and replay it afterwards, without the session-specific crumb and cookie.
+    """
+    return {
+        "record_mode": "once",
+        "filter_query_parameters": ["crumb"],
+        "filter_headers": ["cookie"],
+        "before_record_response": scrub_cookies
+    }
+
+@pytest.fixture(scope="module")
+def vcr_cassette_dir():
+    """
+    Keep recorded cassettes next to this file so replays do not depend on the working directory.
+    """
+    return os.path.join(os.path.dirname(__file__), "cassettes")
+
+def yahoo_reachable():
+    """
+    Returns True if Yahoo Finance accepts a connection, i.e. a missing cassette can be recorded.
+    """
+    try:
+        socket.create_connection(("query1.finance.yahoo.com", 443), timeout=3).close()
+        return True
+    except OSError:
+        return False
+
+@pytest.fixture(autouse=True)
+def isolated_caches(request, monkeypatch, tmp_path):
+    """
+    Start every test with an empty crumb, parsed data and HTTP cache, so cassettes see every request.
+    """
+    main.CRUMB_CACHE.clear()
+    main.PARSED_CACHE.clear()
+    monkeypatch.setattr(main, "CACHE_PATH", str(tmp_path / "yf_cache.sqlite"))
+
+    if request.node.get_closest_marker("vcr"):
+        cassette = os.path.join(request.getfixturevalue("vcr_cassette_dir"),
+                                request.getfixturevalue("vcr_cassette_name") + ".yaml")
+        if not os.path.exists(cassette) and not yahoo_reachable():
+            pytest.skip(f"No cassette at {cassette} and Yahoo Finance is unreachable to record one")
+
+@pytest.mark.vcr
 @pytest.mark.parametrize("ticker_symbol", [ "AAPL", "MSFT", "GOOGL", "AMZN", 
     "TSLA", "META", "V", "JPM", 
     "DIS", "NFLX"])
@@ -30,6 +92,7 @@ def test_get_stock_info_dict_structure(ticker_symbol):
     for key in required_keys:
         assert key in result, f"Missing key '{key}' in result."
 
+@pytest.mark.vcr
 @pytest.mark.parametrize("ticker_symbol", ["AAPL", "MSFT"])
 def test_get_stock_info_data_values(ticker_symbol):
     """
@@ -45,27 +108,128 @@ def test_get_stock_info_data_values(ticker_symbol):
     assert result['Dividend Offered'] in ['Yes', 'No'], \
         f"Unexpected value for Dividend Offered: {result['Dividend Offered']}."
 
-def test_fetch_additional_metrics():
+def test_add_dividend_yields():
+    """
+    Check yields use last calendar year's resampled dividends, fall back to the trailing year for new payers,
+    and are aligned to each ticker's own price, skipping missing and zero prices.
+    """
+    last_year = NOW_NY.year - 1
+    dividends = {
+        # Quarterly payer; the year before last and the current year must not count
+        "AAA": pd.Series([9.0, 0.5, 0.5, 0.5, 0.5, 9.0],
+                         index=pd.to_datetime([f"{last_year - 1}-12-15", f"{last_year}-02-15", f"{last_year}-05-15",
+                                               f"{last_year}-08-15", f"{last_year}-11-15", f"{NOW_NY.year}-01-02"])),
+        # New payer with nothing last year, so its trailing twelve months are used
+        "BBB": pd.Series([0.3], index=[NOW_NY - pd.Timedelta(days=10)]),
+        "CCC": pd.Series([], index=pd.DatetimeIndex([]), dtype=float),
+        # Quoted at zero, which must not produce an infinite yield
+        "EEE": pd.Series([0.5], index=pd.to_datetime([f"{last_year}-06-15"]))
+    }
+    df = pd.DataFrame({"Stock Symbol": ["CCC", "BBB", "AAA", "DDD", "EEE"]})
+    quotes = {"AAA": {"regularMarketPrice": 100.0}, "BBB": {"regularMarketPrice": 10.0},
+              "CCC": {"regularMarketPrice": 50.0}, "DDD": {}, "EEE": {"regularMarketPrice": 0.0}}
+
+    yields = add_dividend_yields(df, quotes, dividends, NOW).set_index("Stock Symbol")["Annual Dividend Yield"]
+
+    assert yields["AAA"] == pytest.approx(2.0)
+    assert yields["BBB"] == pytest.approx(3.0)
+    assert yields["CCC"] == 0
+    assert pd.isna(yields["DDD"])
+    assert pd.isna(yields["EEE"])
+
+def test_get_stock_info_handshake_failure(monkeypatch):
     """
-    Test fetch_additional_metrics to ensure it returns expected keys/values.
+    Ensure get_stock_info still returns the full dictionary, with 'N/A' values, when Yahoo refuses the crumb.
     """
-    symbol = "AAPL"
-    metrics = fetch_additional_metrics(symbol)
-    expected_keys = [
-        "current_price",
-        "trailing_eps",
-        "book_value",
-        "calculated_pe_ratio",
-        "calculated_pb_ratio"
+    transport = httpx.MockTransport(lambda request: httpx.Response(500))
+    monkeypatch.setattr(main, "create_client", lambda: httpx.AsyncClient(transport=transport))
+
+    result = get_stock_info("AAPL")
+
+    assert result["Stock Symbol"] == "AAPL"
+    for key in ['Company Name', 'Next Earnings Report Date', 'Dividend Offered',
+                'Ex-Dividend Date', 'Annual Dividend Yield']:
+        assert result[key] == 'N/A', f"Expected 'N/A' for {key}, found {result[key]}."
+
+def test_fetch_stock_info_uses_latest_dividend():
+    """
+    Check the ex-dividend date is the most recent one in the history, not the oldest.
+    """
+    store_parsed("AAA", "earnings_dates", pd.DatetimeIndex([], tz="UTC"), 60)
+    store_parsed("AAA", "dividends", pd.Series([0.1, 0.2, 0.3],
+                                               index=pd.to_datetime(["2001-02-01", "2010-02-01", "2020-02-01"])), 60)
+
+    # Both fields are served from PARSED_CACHE, so no client is needed
+    info, dividends = asyncio.run(fetch_stock_info(None, "AAA", None, {"shortName": "AAA Corp"}, NOW))
+
+    assert info["Company Name"] == "AAA Corp"
+    assert info["Dividend Offered"] == "Yes"
+    assert info["Ex-Dividend Date"] == pd.Timestamp("2020-02-01")
+    assert info["Next Earnings Report Date"] is None
+    assert len(dividends) == 3
+
+def make_results():
+    """
+    Two fetch_stock_info results: a dividend payer and a ticker without dates.
+    """
+    return [
+        {
+            'Stock Symbol': 'AAA',
+            'Company Name': 'AAA Corp',
+            'Next Earnings Report Date': pd.Timestamp('2030-01-15 16:30'),
+            'Dividend Offered': 'Yes',
+            'Ex-Dividend Date': NOW_NY.normalize()
+        },
+        {
+            'Stock Symbol': 'BBB',
+            'Company Name': 'BBB Corp',
+            'Next Earnings Report Date': None,
+            'Dividend Offered': 'No',
+            'Ex-Dividend Date': None
+        }
     ]
 
-    # Check that all expected keys are present
-    for key in expected_keys:
-        assert key in metrics, f"Missing '{key}' in fetched metrics data."
+def test_build_frame_schema():
+    """
+    Check results are converted to the SCHEMA dtypes, with NaT and NaN for missing values.
+    """
+    df = build_frame(make_results())
+
+    assert list(df.columns) == [name for name, _ in SCHEMA]
+    assert df['Next Earnings Report Date'].dtype == np.dtype('datetime64[ns]')
+    assert df['Ex-Dividend Date'].dtype == np.dtype('datetime64[ns]')
+    assert df['Annual Dividend Yield'].dtype == np.dtype('f8')
+    assert df['Stock Symbol'].tolist() == ['AAA', 'BBB']
+    assert pd.isna(df.loc[1, 'Next Earnings Report Date'])
+    assert df['Annual Dividend Yield'].isna().all()
+
+def test_drop_distant_dates():
+    """
+    Check dates more than six months ahead are cleared and nearer dates are kept.
+    """
+    df = drop_distant_dates(build_frame(make_results()), NOW)
+
+    assert pd.isna(df.loc[0, 'Next Earnings Report Date'])
+    assert df.loc[0, 'Ex-Dividend Date'] == NOW_NY.normalize()
+
+    df = build_frame(make_results())
+    df.loc[0, 'Next Earnings Report Date'] = to_new_york(NOW + MAX_FUTURE)
+    assert drop_distant_dates(df, NOW).loc[0, 'Next Earnings Report Date'] == to_new_york(NOW + MAX_FUTURE)
+
+def test_format_output():
+    """
+    Check dates render as YYYY-MM-DD and yields as percentages, with 'N/A' for missing dates and
+    for missing or zero yields.
+    """
+    df = build_frame(make_results() + make_results())
+    df['Annual Dividend Yield'] = [2.5, np.nan, 0.0, 0.456]
+
+    df = format_output(df)
 
-    # Example check: "current_price" should be float, int, or None
-    assert isinstance(metrics["current_price"], (float, int, type(None))), \
-        f"Expected current_price to be float, int, or None. Found {type(metrics['current_price'])}."
+    assert df['Next Earnings Report Date'].tolist() == ['2030-01-15', 'N/A', '2030-01-15', 'N/A']
+    assert df.loc[0, 'Ex-Dividend Date'] == NOW_NY.strftime('%Y-%m-%d')
+    assert df.loc[1, 'Ex-Dividend Date'] == 'N/A'
+    assert df['Annual Dividend Yield'].tolist() == ['2.50%', 'N/A', 'N/A', '0.46%']
 
 def test_analysis_output_exists():
     """
@@ -83,4 +247,4 @@ def test_analysis_output_non_empty():
         "stock_data.csv not found. Please run data_retrieval.py to generate it."
     
     df = pd.read_csv("stock_data.csv")
-    assert not df.empty,
+    assert not df.empty, "stock_data.csv is empty. No stock data was retrieved."